@@ -0,0 +1,98 @@
+import functools
+import os
+
+
+FILENAME_BUILDNO = 'versioning'
+FILENAME_VERSION_H = 'include/version.h'
+FILENAME_DEFAULT_SETTINGS_CPP = "src/Core/DefaultSettings.cpp"
+FILENAME_DEFAULT_SETTINGS_YAML = "settings/default.yaml"
+
+MAJOR = 0
+MINOR = 1
+version = 'v0.1.'
+build_no = 0
+
+FULL_VERSION = ""
+
+# Cached SCons default environment, built once per process
+_DEFAULT_ENV = None
+
+def get_default_env():
+    global _DEFAULT_ENV
+    if _DEFAULT_ENV is None:
+        from SCons.Script import DefaultEnvironment
+        _DEFAULT_ENV = DefaultEnvironment()
+    return _DEFAULT_ENV
+
+@functools.lru_cache(maxsize=1)
+def is_pio_build():
+    default_env = get_default_env()
+    if hasattr(default_env, "IsCleanTarget") and default_env.IsCleanTarget(): return False
+    return not default_env.IsIntegrationDump()
+
+def update_versioning():
+    global build_no
+    global FULL_VERSION
+
+    # Create the build number file on first build so it can then be opened
+    # once for both read and write
+    if not os.path.exists(FILENAME_BUILDNO):
+        print('Starting build number from 1..')
+        open(FILENAME_BUILDNO, 'w').close()
+
+    build_no = 0
+    with open(FILENAME_BUILDNO, 'r+') as f:
+        try:
+            build_no = int(f.readline()) + 1
+        except ValueError:
+            build_no = 1
+        f.seek(0)
+        f.truncate()
+        f.write(str(build_no))
+        print('Build number: {}'.format(build_no))
+
+    import datetime
+
+    build_time = str(datetime.datetime.now())[:-7]
+    FULL_VERSION = "{}.{}.{} {}".format(MAJOR, MINOR, build_no, build_time)
+
+    hf = """
+    #ifndef BUILD_NUMBER
+        #define BUILD_NUMBER "{}"
+    #endif
+    #ifndef VERSION
+        #define VERSION "{}"
+    #endif
+    #ifndef VERSION_SHORT
+        #define VERSION_SHORT "{}.{}.{}"
+    #endif
+    """.format(
+        build_no,
+        FULL_VERSION,
+        MAJOR, MINOR, build_no)
+    # Only rewrite the header when its content changed, keeping its mtime
+    # stable so every .cpp including it is not recompiled needlessly
+    try:
+        with open(FILENAME_VERSION_H) as f:
+            previous_hf = f.read()
+    except OSError:
+        previous_hf = None
+
+    if previous_hf != hf:
+        with open(FILENAME_VERSION_H, 'w+') as f:
+            f.write(hf)
+
+def generate_default_settings():
+    import settings.defaultsettings as DefaultSettings
+
+    # Skip the whole generation when the generated source is newer than both
+    # the YAML and the generator itself: three stats instead of parse + write
+    try:
+        source_mtime = os.path.getmtime(FILENAME_DEFAULT_SETTINGS_CPP)
+        if (source_mtime >= os.path.getmtime(FILENAME_DEFAULT_SETTINGS_YAML) and
+            source_mtime >= os.path.getmtime(DefaultSettings.__file__)):
+            return
+    except OSError:
+        pass
+
+    DefaultSettings.GenerateDerfaultSettings(FILENAME_DEFAULT_SETTINGS_YAML, FILENAME_DEFAULT_SETTINGS_CPP)
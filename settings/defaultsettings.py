@@ -1,122 +1,240 @@
-import yaml
+import glob
+import hashlib
+import io
+import os
+import pickle
+import sys
+
+# Cache of the parsed default settings, keyed by the YAML file metadata
+SETTINGS_CACHE_PATH = ".pio/build/default_settings.pkl"
+
+# Fixed header of the generated default settings source file
+SOURCE_FILE_HEADER = (
+    "/*******************************************************************************\n"
+    " * @file SettingsDefault.cpp\n"
+    " *\n"
+    " * @see Settings.h\n"
+    " *\n"
+    " * @author Alexy Torres Aurora Dugo\n"
+    " *\n"
+    " * @date 18/12/2025\n"
+    " *\n"
+    " * @version 1.0\n"
+    " *\n"
+    " * @brief Weather Station Firmware default setting repository.\n"
+    " *\n"
+    " * @details Weather Station Firmware default setting repository. This file \n"
+    " * is auto-generated and contains the default settings used by the firmware.\n"
+    " *\n"
+    " * @copyright Alexy Torres Aurora Dugo\n"
+    " ******************************************************************************/\n"
+    "\n"
+    "/*******************************************************************************\n"
+    " * INCLUDES\n"
+    " ******************************************************************************/\n"
+    "#include <cstdint>       /* Standard int types */\n"
+    "#include <Settings.h>    /* Settings */\n"
+    "#include <unordered_map> /* Settings map */\n"
+    "/*******************************************************************************\n"
+    " * CONSTANTS\n"
+    " ******************************************************************************/\n"
+    "\n"
+    "/*******************************************************************************\n"
+    " * STRUCTURES AND TYPES\n"
+    " ******************************************************************************/\n"
+    "/* None */\n"
+    "\n"
+    "/*******************************************************************************\n"
+    " * MACROS\n"
+    " ******************************************************************************/\n"
+    "/* None */\n"
+    "\n"
+    "/*******************************************************************************\n"
+    " * STATIC FUNCTIONS DECLARATIONS\n"
+    " ******************************************************************************/\n"
+    "/* None */\n"
+    "\n"
+    "/*******************************************************************************\n"
+    " * GLOBAL VARIABLES\n"
+    " ******************************************************************************/\n"
+    "\n"
+    "/************************* Imported global variables **************************/\n"
+    "/* None */\n"
+    "\n"
+    "/************************* Exported global variables **************************/\n"
+    "/* None */\n"
+    "\n"
+    "/************************** Static global variables ***************************/\n"
+)
+
+# Fixed section banners between the settings and the class methods
+SOURCE_FILE_FUNCTIONS = (
+    "/*******************************************************************************\n"
+    " * FUNCTIONS\n"
+    " ******************************************************************************/\n"
+    "/* None */\n"
+    "\n"
+    "/*******************************************************************************\n"
+    " * CLASS METHODS\n"
+    " ******************************************************************************/\n"
+)
+
+# Template of one default setting declaration
+SETTING_DECL_TEMPLATE = (
+    "/** @brief Default setting for {key} item. */\n"
+    "static const {type} sk{key} = {value};\n"
+)
+
+# Template of one default setting registration in InitializeDefault,
+# %-style so the C++ braces need no escaping
+INIT_ENTRY_TEMPLATE = (
+    "\tthis->_defaults.emplace(\n"
+    "\t\t%s,\n"
+    "\t\tS_SettingField {\n"
+    "\t\t\t.pValue = (uint8_t*)%s,\n"
+    "\t\t\t.fieldSize = %s\n"
+    "\t\t}\n"
+    "\t);\n"
+)
+
+def LoadSettings(settingPath):
+    # The cache key is the YAML (mtime, size) pair: a hit means the file was
+    # not modified since the last build and the parse can be skipped
+    settingStat = os.stat(settingPath)
+    cacheKey = (settingStat.st_mtime, settingStat.st_size)
+    try:
+        with open(SETTINGS_CACHE_PATH, 'rb') as cacheFile:
+            cached = pickle.load(cacheFile)
+            # Validate the cache shape before use: any corrupted content is
+            # treated as a miss
+            if isinstance(cached, tuple) and len(cached) == 2:
+                cachedKey, cachedColumns = cached
+                if cachedKey == cacheKey and \
+                   isinstance(cachedColumns, tuple) and \
+                   len(cachedColumns) == 5:
+                    return cachedColumns
+    except (OSError, pickle.PickleError, EOFError, ValueError):
+        pass
+
+    # Read raw bytes: the hash works on bytes anyway and the loader handles
+    # the UTF-8 decoding itself, in C when libyaml is available
+    with open(settingPath, 'rb') as file:
+        yamlContent = file.read()
+
+    # A pre-parsed sidecar keyed on the YAML content hash survives mtime
+    # changes (checkouts, touch) and is much faster to load than the parse
+    contentHash = hashlib.blake2b(yamlContent).hexdigest()
+    sidecarPath = "{}.{}.pkl".format(settingPath, contentHash)
+    columns = None
+    try:
+        with open(sidecarPath, 'rb') as sidecarFile:
+            cached = pickle.load(sidecarFile)
+            if isinstance(cached, tuple) and len(cached) == 5:
+                columns = cached
+    except (OSError, pickle.PickleError, EOFError, ValueError):
+        pass
+
+    if columns is None:
+        # Only import yaml when an actual parse is needed: cache hits and
+        # clean targets never pay the extension load
+        import yaml
+
+        # Load the settings, letting parse errors propagate so the build
+        # fails immediately instead of generating an empty source file
+        # Prefer the libyaml C loader when available, fallback to the
+        # pure-Python loader otherwise
+        loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+        loaded = yaml.load(yamlContent, Loader=loader)
+
+        # Materialize the settings as parallel column tuples in a single
+        # pass: the generation steps stream over plain sequences without
+        # repeated dict lookups, and the columns pickle compactly
+        if loaded:
+            columns = tuple(zip(*(
+                (key, value["type"], value["value"], value["size"],
+                 '*' in value["type"])
+                for key, value in loaded.items()
+            )))
+        else:
+            columns = ((), (), (), (), ())
+
+        # Drop sidecars of previous YAML revisions before writing the new one
+        try:
+            for stalePath in glob.glob("{}.*.pkl".format(settingPath)):
+                os.remove(stalePath)
+            with open(sidecarPath, 'wb') as sidecarFile:
+                pickle.dump(columns, sidecarFile, protocol=5)
+        except OSError:
+            pass
+
+    try:
+        os.makedirs(os.path.dirname(SETTINGS_CACHE_PATH), exist_ok=True)
+        with open(SETTINGS_CACHE_PATH, 'wb') as cacheFile:
+            pickle.dump((cacheKey, columns), cacheFile)
+    except OSError:
+        pass
+
+    return columns
 
 def BuildFileStart(sourceFile):
-    sourceFile.write(
-        "/*******************************************************************************\n" +
-        " * @file SettingsDefault.cpp\n" +
-        " *\n" +
-        " * @see Settings.h\n" +
-        " *\n" +
-        " * @author Alexy Torres Aurora Dugo\n" +
-        " *\n" +
-        " * @date 18/12/2025\n" +
-        " *\n" +
-        " * @version 1.0\n" +
-        " *\n" +
-        " * @brief Weather Station Firmware default setting repository.\n" +
-        " *\n" +
-        " * @details Weather Station Firmware default setting repository. This file \n" +
-        " * is auto-generated and contains the default settings used by the firmware.\n" +
-        " *\n" +
-        " * @copyright Alexy Torres Aurora Dugo\n" +
-        " ******************************************************************************/\n" +
-        "\n" +
-        "/*******************************************************************************\n" +
-        " * INCLUDES\n" +
-        " ******************************************************************************/\n" +
-        "#include <cstdint>       /* Standard int types */\n" +
-        "#include <Settings.h>    /* Settings */\n" +
-        "#include <unordered_map> /* Settings map */" +
-        "\n" +
-        "/*******************************************************************************\n" +
-        " * CONSTANTS\n" +
-        " ******************************************************************************/\n" +
-        "\n" +
-        "/*******************************************************************************\n" +
-        " * STRUCTURES AND TYPES\n" +
-        " ******************************************************************************/\n" +
-        "/* None */\n" +
-        "\n" +
-        "/*******************************************************************************\n" +
-        " * MACROS\n" +
-        " ******************************************************************************/\n" +
-        "/* None */\n" +
-        "\n" +
-        "/*******************************************************************************\n" +
-        " * STATIC FUNCTIONS DECLARATIONS\n" +
-        " ******************************************************************************/\n" +
-        "/* None */\n" +
-        "\n" +
-        "/*******************************************************************************\n" +
-        " * GLOBAL VARIABLES\n" +
-        " ******************************************************************************/\n" +
-        "\n" +
-        "/************************* Imported global variables **************************/\n" +
-        "/* None */\n" +
-        "\n" +
-        "/************************* Exported global variables **************************/\n" +
-        "/* None */\n" +
-        "\n" +
-        "/************************** Static global variables ***************************/\n"
-    )
+    sourceFile.write(SOURCE_FILE_HEADER)
 
 
 def BuildSettings(sourceFile, settingPath):
-    with open(settingPath, 'r', encoding="utf-8") as file:
-        # Load the settings
-        loaded = {}
-        try:
-            loaded = yaml.safe_load(file)
-        except yaml.YAMLError as exc:
-            print(exc)
+    columns = LoadSettings(settingPath)
+    keys, types, values, _, _ = columns
+
+    for key, settingType, value in zip(keys, types, values):
+        sourceFile.write(SETTING_DECL_TEMPLATE.format(key=key,
+                                                      type=settingType,
+                                                      value=value))
 
-        for key, value in loaded.items():
-            print("==== Setting: {}".format(key))
-            sourceFile.write("/** @brief Default setting for {} item. */\n".format(key))
-            sourceFile.write("static const {} sk{} = {};\n".format(value["type"], key, value["value"]))
+    # Emit the per-setting log in one write, and only when requested: the
+    # per-line flushes are measurable on verbose CI logs
+    if os.environ.get("SETTINGS_VERBOSE"):
+        sys.stdout.write("".join(
+            "==== Setting: {}\n".format(key) for key in keys
+        ))
 
-        sourceFile.write("\n")
-        return loaded
+    sourceFile.write("\n")
+    return columns
 
 def BuildFileNext(sourceFile):
-    sourceFile.write(
-        "/*******************************************************************************\n" +
-        " * FUNCTIONS\n" +
-        " ******************************************************************************/\n" +
-        "/* None */\n" +
-        "\n" +
-        "/*******************************************************************************\n" +
-        " * CLASS METHODS\n" +
-        " ******************************************************************************/\n"
-    )
+    sourceFile.write(SOURCE_FILE_FUNCTIONS)
 
 def BuildFileInit(sourceFile, settings):
-    sourceFile.write("void Settings::InitializeDefault(void) noexcept {\n")
-    for key, value in settings.items():
-        addRef = True
-        if '*' in value["type"]:
-            addRef = False
-        sourceFile.write(
-            "\tthis->_defaults.emplace(\n" +
-            f"\t\t{'SETTING_' + key.upper()},\n" +
-            "\t\tS_SettingField {\n")
-
-        if addRef:
-            sourceFile.write(f"\t\t\t.pValue = (uint8_t*)&sk{key},\n")
-        else:
-            sourceFile.write(f"\t\t\t.pValue = (uint8_t*)sk{key},\n")
+    keys, _, _, sizes, isPointers = settings
 
-        sourceFile.write(
-            f"\t\t\t.fieldSize = {value['size']}\n" +
-            "\t\t}\n" +
-            "\t);\n")
-
-    sourceFile.write("}")
+    # Pointer settings are stored by value, scalar settings by address
+    prepared = [
+        ("SETTING_" + key.upper(),
+         ("sk" + key) if isPointer else ("&sk" + key),
+         size)
+        for key, size, isPointer in zip(keys, sizes, isPointers)
+    ]
+    sourceFile.write(
+        "void Settings::InitializeDefault(void) noexcept {\n" +
+        "".join(INIT_ENTRY_TEMPLATE % entry for entry in prepared) +
+        "}"
+    )
 
 
 def GenerateDerfaultSettings(settingPath, sourcePath):
-    with open(sourcePath, 'w', encoding="utf-8") as sourceFile:
-        BuildFileStart(sourceFile)
-        settings = BuildSettings(sourceFile, settingPath)
-        BuildFileNext(sourceFile)
-        BuildFileInit(sourceFile, settings)
\ No newline at end of file
+    # Generate in memory first: the file is only rewritten when its content
+    # actually changed, keeping its mtime stable for incremental builds
+    sourceFile = io.StringIO()
+    BuildFileStart(sourceFile)
+    settings = BuildSettings(sourceFile, settingPath)
+    BuildFileNext(sourceFile)
+    BuildFileInit(sourceFile, settings)
+
+    generated = sourceFile.getvalue()
+    try:
+        with open(sourcePath, 'r', encoding="utf-8") as previousFile:
+            if previousFile.read() == generated:
+                return
+    except OSError:
+        pass
+
+    with open(sourcePath, 'w', encoding="utf-8") as outputFile:
+        outputFile.write(generated)
\ No newline at end of file